@@ -8,12 +8,26 @@ from googleapiclient.discovery import build
 
 SCOPES = ["https://www.googleapis.com/auth/calendar"]
 
+# (service, credentials) already built in this process, keyed on token path
+_SESSIONS = {}
+
 def authenticate_google_calendar(credentials_path="credentials.json", token_path="token.json"):
     # Authenticates the Google Calendar API 
+    return _session(credentials_path, token_path)[0]
+
+def get_calendar_credentials(credentials_path="credentials.json", token_path="token.json"):
+    # OAuth credentials behind the Calendar service, for transports used off the main thread
+    return _session(credentials_path, token_path)[1]
+
+def _session(credentials_path, token_path):
+    if token_path in _SESSIONS:
+        return _SESSIONS[token_path]
+
     creds = None
 
     if os.path.exists(token_path):
         creds = Credentials.from_authorized_user_file(token_path, SCOPES)
+    old_token = creds.token if creds else None
 
     if not creds or not creds.valid:
         if creds and creds.expired and creds.refresh_token:
@@ -24,7 +38,13 @@ def authenticate_google_calendar(credentials_path="credentials.json", token_path
             flow = InstalledAppFlow.from_client_secrets_file(credentials_path, SCOPES)
             creds = flow.run_local_server(port=8080)
 
+    # Only rewrite the token file when a refresh or new flow produced a new token
+    if creds.token != old_token:
         with open(token_path, "w") as token:
             token.write(creds.to_json())
 
-    return build("calendar", "v3", credentials=creds)
+    # Bundled discovery document; static_discovery=True is already the default without a
+    # discoveryServiceUrl and is only spelled out here, so behaviour is unchanged
+    service = build("calendar", "v3", credentials=creds, static_discovery=True, cache_discovery=False)
+    _SESSIONS[token_path] = (service, creds)
+    return service, creds
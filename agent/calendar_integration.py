@@ -1,25 +1,75 @@
+import asyncio
 import datetime
+import heapq
+import math
+import threading
+from cachetools import TTLCache
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, time,timedelta
 from typing import List, Optional, Dict, Tuple
 from google.oauth2.credentials import Credentials
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
-from dataclasses import dataclass
-import pytz
+from googleapiclient.http import build_http
+from dataclasses import dataclass, field
+import google_auth_httplib2
+from zoneinfo import ZoneInfo
 
-@dataclass
+try:
+    from ciso8601 import parse_datetime as _parse_iso  # optional C parser, handles 'Z' natively
+except ImportError:
+    def _parse_iso(value: str) -> datetime:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+# Google caps a single batch HTTP request at 50 calls
+MAX_BATCH_SIZE = 50
+
+# Cap on events returned per events.list call
+MAX_EVENTS_PER_REQUEST = 250
+
+# Partial-response mask: only the event fields _parse_events reads
+EVENT_FIELDS = "items(id,summary,start,end)"
+
+# How long fetched events are reused before hitting the API again
+EVENT_CACHE_TTL_SECONDS = 60
+EVENT_CACHE_MAX_WINDOWS = 128
+
+# How long a turn waits on the calendar prefetch before replying without it
+PREFETCH_WAIT_SECONDS = 2.0
+
+# Granularity of candidate start times within a free interval
+SLOT_STEP_MINUTES = 15
+
+# Alternatives taken from any one day, so suggestions span several days
+ALTERNATIVE_SLOTS_PER_DAY = 2
+
+# Events this close to a slot still affect its confidence, so fetch windows are padded by it
+SLOT_BUFFER_HOURS = 0.25
+
+def _hour_preference(hour: int) -> float:
+    """Confidence adjustment for starting a meeting at a given local hour"""
+    if 10 <= hour <= 11:  # Morning sweet spot
+        return 0.2
+    if 14 <= hour <= 15:  # Afternoon sweet spot
+        return 0.1
+    if hour < 9 or hour > 17:  # Outside normal hours
+        return -0.3
+    if 12 <= hour <= 13:  # Avoid right after lunch
+        return -0.1
+    return 0.0
+
+# Precomputed so scoring is a single lookup per slot
+_HOUR_BONUS = {hour: _hour_preference(hour) for hour in range(24)}
+
+@dataclass(slots=True)
 class CalendarEvent:
     id: str
     title: str
     start_time: datetime
     end_time: datetime
-    attendees: List[str] = None
-    
-    def __post_init__(self):
-        if self.attendees is None:
-            self.attendees = []
+    attendees: List[str] = field(default_factory=list)
 
-@dataclass
+@dataclass(slots=True)
 class TimeSlot:
     start_time: datetime
     end_time: datetime
@@ -32,161 +82,359 @@ class TimeSlot:
         return int((self.end_time - self.start_time).total_seconds() / 60)
 
 class AdvancedCalendarManager:
-    def __init__(self, service, timezone: str = "America/New_York"):
+    def __init__(self, service, timezone: str = "America/New_York", credentials=None):
         self.service = service
-        self.timezone = pytz.timezone(timezone)
+        # Used to build the worker thread's own transport (httplib2.Http is not thread-safe)
+        self.credentials = credentials
+        self._worker_http = None
+        # One dedicated prefetch thread; a prefetch still running is never overlapped by another
+        self._prefetch_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="calendar-prefetch")
+        self._prefetch_running = threading.Lock()
+        self.timezone = ZoneInfo(timezone)
+        self._utc = ZoneInfo("UTC")
+        self._tz_str = str(self.timezone)
+        self.calendar_id = 'primary'
+
+        # (calendar_id, time_min_utc, time_max_utc) -> events; entries expire after the TTL.
+        # The prefetch thread writes to it too, so access goes through _cache_lock, and
+        # _cache_generation lets a fetch that raced an invalidation drop its stale result.
+        self._event_cache: TTLCache = TTLCache(maxsize=EVENT_CACHE_MAX_WINDOWS, ttl=EVENT_CACHE_TTL_SECONDS)
+        self._cache_lock = threading.Lock()
+        self._cache_generation = 0
+        
+    def _time_window(self, start_date: datetime.date, end_date: datetime.date,
+                     time_min_hour: Optional[float] = None,
+                     time_max_hour: Optional[float] = None) -> Tuple[datetime, datetime]:
+        """UTC bounds for a date range, optionally narrowed to an hour window"""
+        tz = self.timezone
+        start_datetime = datetime.combine(start_date, time.min, tzinfo=tz)
+        if time_min_hour is not None:
+            start_datetime += timedelta(hours=time_min_hour)
+        if time_max_hour is None:
+            end_datetime = datetime.combine(end_date, time.max, tzinfo=tz)
+        else:
+            end_datetime = datetime.combine(end_date, time.min, tzinfo=tz) + timedelta(hours=time_max_hour)
+        return start_datetime.astimezone(self._utc), end_datetime.astimezone(self._utc)
+
+    def _day_bounds_utc(self, day: datetime.date) -> Tuple[str, str]:
+        """ISO-formatted UTC start and end of a local calendar day"""
+        start_utc, end_utc = self._time_window(day, day)
+        return start_utc.isoformat(), end_utc.isoformat()
+
+    def _events_request(self, time_min: datetime, time_max: datetime,
+                        max_results: Optional[int] = None):
+        """Build the events.list request for a UTC time window"""
+        params = {}
+        if max_results is not None:
+            params['maxResults'] = max_results
+
+        return self.service.events().list(
+            calendarId=self.calendar_id,
+            timeMin=time_min.isoformat(),
+            timeMax=time_max.isoformat(),
+            singleEvents=True,
+            orderBy='startTime',
+            fields=EVENT_FIELDS,
+            **params
+        )
+
+    def _parse_events(self, events_result: dict) -> List[CalendarEvent]:
+        """Convert an events.list response into CalendarEvent objects"""
+        events = []
+        tz = self.timezone
+        _parse = _parse_iso
+        for event in events_result.get('items', []):
+            start_str = event['start'].get('dateTime', event['start'].get('date'))
+            end_str = event['end'].get('dateTime', event['end'].get('date'))
+            
+            # Parse times
+            start_time = _parse(start_str)
+            end_time = _parse(end_str)
+            
+            # Convert to local timezone; all-day events come back as bare dates
+            if start_time.tzinfo:
+                start_time = start_time.astimezone(tz)
+                end_time = end_time.astimezone(tz)
+            else:
+                start_time = start_time.replace(tzinfo=tz)
+                end_time = end_time.replace(tzinfo=tz)
+            
+            events.append(CalendarEvent(
+                id=event['id'],
+                title=event.get('summary', 'Untitled Event'),
+                start_time=start_time,
+                end_time=end_time
+            ))
         
+        return events
+
+    def _cached_events(self, time_min: datetime, time_max: datetime) -> Optional[List[CalendarEvent]]:
+        """Return fresh cached events for a window, served from any cached window covering it"""
+        with self._cache_lock:
+            for key, events in list(self._event_cache.items()):
+                calendar_id, cached_min, cached_max = key
+                if calendar_id == self.calendar_id and cached_min <= time_min and time_max <= cached_max:
+                    return [e for e in events if e.end_time > time_min and e.start_time < time_max]
+        return None
+
+    def _store_events(self, time_min: datetime, time_max: datetime,
+                      events: List[CalendarEvent], max_results: Optional[int] = None,
+                      generation: Optional[int] = None):
+        """Cache a fetched window unless the response was truncated or invalidated mid-flight"""
+        if max_results is not None and len(events) >= max_results:
+            return
+        with self._cache_lock:
+            if generation is not None and generation != self._cache_generation:
+                return
+            self._event_cache[(self.calendar_id, time_min, time_max)] = events
+
+    def _invalidate_events(self, start_time: datetime, end_time: datetime):
+        """Drop cached windows overlapping a time range that just changed"""
+        with self._cache_lock:
+            self._cache_generation += 1
+            for key in list(self._event_cache):
+                _, cached_min, cached_max = key
+                if cached_min < end_time and start_time < cached_max:
+                    self._event_cache.pop(key, None)
+
     def get_events_for_date_range(self, start_date: datetime.date, 
-                                 end_date: datetime.date) -> List[CalendarEvent]:
+                                 end_date: datetime.date,
+                                 time_min_hour: Optional[float] = None,
+                                 time_max_hour: Optional[float] = None,
+                                 max_results: Optional[int] = None) -> List[CalendarEvent]:
         """Get all events in a date range"""
-        start_datetime = datetime.combine(start_date, time.min)
-        end_datetime = datetime.combine(end_date, time.max)
-        start_utc = self.timezone.localize(start_datetime).astimezone(pytz.UTC)
-        end_utc = self.timezone.localize(end_datetime).astimezone(pytz.UTC)
-        
+        time_min, time_max = self._time_window(start_date, end_date, time_min_hour, time_max_hour)
+        cached = self._cached_events(time_min, time_max)
+        if cached is not None:
+            return cached
+
         try:
-            events_result = self.service.events().list(
-                calendarId='primary',
-                timeMin=start_utc.isoformat(),
-                timeMax=end_utc.isoformat(),
-                singleEvents=True,
-                orderBy='startTime'
-            ).execute()
-            
-            events = []
-            for event in events_result.get('items', []):
-                start_str = event['start'].get('dateTime', event['start'].get('date'))
-                end_str = event['end'].get('dateTime', event['end'].get('date'))
-                
-                # Parse times
-                start_time = datetime.fromisoformat(start_str.replace('Z', '+00:00'))
-                end_time = datetime.fromisoformat(end_str.replace('Z', '+00:00'))
-                
-                # Convert to local timezone
-                if start_time.tzinfo:
-                    start_time = start_time.astimezone(self.timezone)
-                    end_time = end_time.astimezone(self.timezone)
-                
-                events.append(CalendarEvent(
-                    id=event['id'],
-                    title=event.get('summary', 'Untitled Event'),
-                    start_time=start_time,
-                    end_time=end_time
-                ))
-            
-            return events
+            events_result = self._events_request(time_min, time_max, max_results).execute()
+            events = self._parse_events(events_result)
+            self._store_events(time_min, time_max, events, max_results)
+            return list(events)
             
         except HttpError as error:
             print(f"Calendar API error: {error}")
             return []
-    
+
+    def _prefetch_http(self):
+        """Prefetch transport, built once so its keep-alive connection is reused across turns"""
+        # Only the single prefetch thread uses it; without credentials the batch falls
+        # back to the service's own transport
+        if self._worker_http is None and self.credentials is not None:
+            # build_http() carries googleapiclient's default socket timeout, unlike a bare httplib2.Http()
+            self._worker_http = google_auth_httplib2.AuthorizedHttp(self.credentials, http=build_http())
+        return self._worker_http
+
+    def _batch_fetch_days(self, dates: List[datetime.date],
+                          time_min_hour: Optional[float] = None,
+                          time_max_hour: Optional[float] = None,
+                          max_results: Optional[int] = None,
+                          http=None) -> Dict[datetime.date, List[CalendarEvent]]:
+        """Fetch events for several days in a single batch HTTP round trip"""
+        events_by_date = {}
+        windows = {}
+        generation = self._cache_generation
+        for d in dates:
+            time_min, time_max = self._time_window(d, d, time_min_hour, time_max_hour)
+            cached = self._cached_events(time_min, time_max)
+            if cached is not None:
+                events_by_date[d] = cached
+            else:
+                events_by_date[d] = []
+                windows[str(d)] = (d, time_min, time_max)
+
+        def collect(request_id, response, exception):
+            if exception is not None:
+                print(f"Calendar API error: {exception}")
+                return
+            d, time_min, time_max = windows[request_id]
+            events = self._parse_events(response)
+            self._store_events(time_min, time_max, events, max_results, generation)
+            events_by_date[d] = list(events)
+
+        pending = list(windows.items())
+        for i in range(0, len(pending), MAX_BATCH_SIZE):
+            batch = self.service.new_batch_http_request(callback=collect)
+            for request_id, (_, time_min, time_max) in pending[i:i + MAX_BATCH_SIZE]:
+                batch.add(self._events_request(time_min, time_max, max_results), request_id=request_id)
+            try:
+                batch.execute(http=http)
+            except HttpError as error:
+                print(f"Calendar API error: {error}")
+
+        return events_by_date
+
+    async def prefetch_days_async(self, dates: List[datetime.date],
+                                  timeout: float = PREFETCH_WAIT_SECONDS):
+        """Warm the event cache for whole days with one batched request, waiting at most timeout"""
+        if not self._prefetch_running.acquire(blocking=False):
+            return  # The previous prefetch is still in flight on the worker transport
+        try:
+            future = asyncio.get_running_loop().run_in_executor(self._prefetch_executor, self._prefetch, dates)
+        except BaseException:
+            self._prefetch_running.release()
+            raise
+        try:
+            # shield: on timeout the fetch keeps running and still fills the cache for later turns
+            await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            print("⚠️ Calendar prefetch is slow; continuing without waiting for it")
+        except Exception as e:
+            # Best effort: a failed prefetch just means a cold cache later
+            print(f"⚠️ Calendar prefetch failed: {e}")
+
+    def _prefetch(self, dates: List[datetime.date]):
+        """Prefetch thread body; releases the in-flight flag however the fetch ends"""
+        try:
+            self._batch_fetch_days(dates, max_results=MAX_EVENTS_PER_REQUEST, http=self._prefetch_http())
+        finally:
+            self._prefetch_running.release()
+
+    def _working_hours(self, preferred_time_range: Optional[Tuple[float, float]]) -> Tuple[float, float]:
+        """Resolve the (start_hour, end_hour) window to search, defaulting to 9-5"""
+        if preferred_time_range:
+            return preferred_time_range
+        return 9, 17
+
     def find_optimal_slots(self, target_date: datetime.date, duration_minutes: int,
-                          preferred_time_range: Optional[Tuple[int, int]] = None,
-                          max_slots: int = 5) -> List[TimeSlot]:
+                          preferred_time_range: Optional[Tuple[float, float]] = None,
+                          max_slots: int = 5,
+                          events: Optional[List[CalendarEvent]] = None) -> List[TimeSlot]:
         """Find optimal meeting slots with confidence scoring"""
         
-        # Default working hours
-        work_start = 9  # 9 AM
-        work_end = 17   # 5 PM
-        
-       
-        
-        # Get existing events
-        events = self.get_events_for_date_range(target_date, target_date)
-        
-        # Create time slots
-        slots = []
-
-        if preferred_time_range:
-            try:
-                if isinstance(preferred_time_range, dict):
-                    work_start = float(preferred_time_range.get("start_hour", 9))
-                    work_end = float(preferred_time_range.get("end_hour", 17))
-                elif isinstance(preferred_time_range, tuple):
-                    work_start, work_end = map(float, preferred_time_range)
-                else:
-                    work_start, work_end = 9, 17
-
-            except Exception as e:
-                print("⚠️ Failed to parse preferred_time_range:", e)
-                work_start, work_end = 9, 17
-        else:
-            work_start, work_end = 9, 17
+        work_start, work_end = self._working_hours(preferred_time_range)
 
+        # Get existing events unless the caller already fetched them
+        if events is None:
+            events = self.get_events_for_date_range(
+                target_date, target_date,
+                time_min_hour=work_start - SLOT_BUFFER_HOURS,
+                time_max_hour=work_end + SLOT_BUFFER_HOURS,
+                max_results=MAX_EVENTS_PER_REQUEST
+            )
+        
         start_hour = int(work_start)
         start_minute = int((work_start - start_hour) * 60)
 
         end_hour = int(work_end)
         end_minute = int((work_end - end_hour) * 60)
 
-        current_time = datetime.combine(target_date, time(start_hour, start_minute))
-        current_time = self.timezone.localize(current_time)
+        current_time = datetime.combine(target_date, time(start_hour, start_minute), tzinfo=self.timezone)
+        end_of_day = datetime.combine(target_date, time(end_hour, end_minute), tzinfo=self.timezone)
 
-        end_of_day = datetime.combine(target_date, time(end_hour, end_minute))
-        end_of_day = self.timezone.localize(end_of_day)
+        # Work in epoch seconds from here on; datetimes are only rebuilt for the returned slots
+        work_start_ts = current_time.timestamp()
+        work_end_ts = end_of_day.timestamp()
+        duration_s = duration_minutes * 60
+        # Local wall-clock offset for the day, used to derive the hour of each candidate
+        utc_offset_s = current_time.utcoffset().total_seconds()
 
-        
-        
-        # current_time = datetime.combine(target_date, time(work_start, 0))
-        # current_time = self.timezone.localize(current_time)
-
-        # end_of_day = datetime.combine(target_date, time(work_end, 0))
-        # end_of_day = self.timezone.localize(end_of_day)
-        
         # Sort events by start time
         events.sort(key=lambda e: e.start_time)
+        starts = [e.start_time.timestamp() for e in events]
+        ends = [e.end_time.timestamp() for e in events]
+        sorted_ends = sorted(ends)
+
+        # Merge overlapping busy intervals inside the working window
+        busy = []
+        for event_start, event_end in zip(starts, ends):
+            if event_start >= work_end_ts:
+                break  # Sorted by start, so nothing later can overlap the window
+            busy_start = max(event_start, work_start_ts)
+            busy_end = min(event_end, work_end_ts)
+            if busy_end <= busy_start:
+                continue
+            if busy and busy_start <= busy[-1][1]:
+                busy[-1][1] = max(busy[-1][1], busy_end)
+            else:
+                busy.append([busy_start, busy_end])
+
+        # Free intervals are the gaps between busy blocks
+        free = []
+        current_ts = work_start_ts
+        for busy_start, busy_end in busy:
+            if busy_start > current_ts:
+                free.append((current_ts, busy_start))
+            current_ts = max(current_ts, busy_end)
+        if current_ts < work_end_ts:
+            free.append((current_ts, work_end_ts))
+
+        # Candidate starts: the start of each gap, then every quarter hour that still fits.
+        # Gaps are in order, so the combined list is ascending.
+        step = SLOT_STEP_MINUTES * 60
+        candidate_starts = []
+        candidate_gaps = []
+        for gap, (free_start, free_end) in enumerate(free):
+            first = math.ceil(free_start)
+            last = math.floor(free_end - duration_s)
+            if last < first:
+                continue
+            gap_starts = [first, *range(first - first % step + step, last + 1, step)]
+            candidate_starts.extend(gap_starts)
+            candidate_gaps.extend([gap] * len(gap_starts))
+
+        confidences = self._score_candidates(candidate_starts, duration_s, utc_offset_s, starts, sorted_ends)
+
+        # Offer at most one start per hour of each gap, so a free day yields spread-out
+        # suggestions rather than back-to-back quarter hours
+        spread = {}
+        for order, (ts, gap, confidence) in enumerate(zip(candidate_starts, candidate_gaps, confidences)):
+            bucket = (gap, int((ts + utc_offset_s) // 3600))
+            if bucket not in spread or confidence > spread[bucket][0]:
+                spread[bucket] = (confidence, -order, ts)
+
+        # Bounded min-heap of the best max_slots candidates as (confidence, -order, start_ts);
+        # the negated order makes earlier slots win ties, as the old stable sort did
+        best = []
+        for entry in spread.values():
+            if len(best) < max_slots:
+                heapq.heappush(best, entry)
+            else:
+                heapq.heappushpop(best, entry)
         
-        for event in events:
-            # Check if there's space before this event
-            if (event.start_time - current_time).total_seconds() >= duration_minutes * 60:
-                slot_end = current_time + timedelta(minutes=duration_minutes)
-                if slot_end <= event.start_time:
-                    confidence = self._calculate_slot_confidence(current_time, duration_minutes, events)
-                    slots.append(TimeSlot(current_time, slot_end, confidence))
-            
-            # Move current time to after this event
-            current_time = max(current_time, event.end_time)
-        
-        # Check for slot after last event
-        if (end_of_day - current_time).total_seconds() >= duration_minutes * 60:
-            slot_end = current_time + timedelta(minutes=duration_minutes)
-            if slot_end <= end_of_day:
-                confidence = self._calculate_slot_confidence(current_time, duration_minutes, events)
-                slots.append(TimeSlot(current_time, slot_end, confidence))
-        
-        # Sort by confidence and return top slots
-        slots.sort(key=lambda s: s.confidence, reverse=True)
-        return slots[:max_slots]
+        # Highest confidence first; only the kept candidates become TimeSlots
+        duration = timedelta(minutes=duration_minutes)
+        slots = []
+        for confidence, _, ts in sorted(best, reverse=True):
+            slot_start = datetime.fromtimestamp(ts, self.timezone)
+            slots.append(TimeSlot(slot_start, slot_start + duration, confidence))
+        return slots
+
+    def _score_candidates(self, candidate_starts: List[int], duration_s: float, utc_offset_s: float,
+                          start_times: List[float], end_times: List[float]) -> List[float]:
+        """Score ascending candidate starts in one merge pass over sorted event start and end times"""
+        buffer_s = SLOT_BUFFER_HOURS * 3600
+        n_starts, n_ends = len(start_times), len(end_times)
+        # Each pointer counts events at or before a bound that only moves forward,
+        # so the whole pass is O(candidates + events)
+        ends_too_early = ends_before_slot = 0       # end <= slot_start - buffer, end < slot_start
+        starts_within_slot = starts_before_gap = 0  # start <= slot_end, start < slot_end + buffer
+
+        confidences = []
+        for ts in candidate_starts:
+            slot_end = ts + duration_s
+            while ends_too_early < n_ends and end_times[ends_too_early] <= ts - buffer_s:
+                ends_too_early += 1
+            while ends_before_slot < n_ends and end_times[ends_before_slot] < ts:
+                ends_before_slot += 1
+            while starts_within_slot < n_starts and start_times[starts_within_slot] <= slot_end:
+                starts_within_slot += 1
+            while starts_before_gap < n_starts and start_times[starts_before_gap] < slot_end + buffer_s:
+                starts_before_gap += 1
+
+            nearby_events = (ends_before_slot - ends_too_early) + (starts_before_gap - starts_within_slot)
+            hour = int((ts + utc_offset_s) // 3600 % 24)
+            confidences.append(self._calculate_slot_confidence(hour, nearby_events))
+        return confidences
     
-    def _calculate_slot_confidence(self, start_time: datetime, 
-                                  duration_minutes: int, events: List[CalendarEvent]) -> float:
-        """Calculate confidence score for a time slot"""
-        confidence = 1.0
-        
-        # Prefer certain times of day
-        hour = start_time.hour
-        if 10 <= hour <= 11:  # Morning sweet spot
-            confidence += 0.2
-        elif 14 <= hour <= 15:  # Afternoon sweet spot
-            confidence += 0.1
-        elif hour < 9 or hour > 17:  # Outside normal hours
-            confidence -= 0.3
-        
-        # Avoid right after lunch
-        if 12 <= hour <= 13:
-            confidence -= 0.1
+    def _calculate_slot_confidence(self, hour: int, nearby_events: int) -> float:
+        """Calculate confidence score from a slot's local start hour and the events within 15 min of it"""
+        confidence = 1.0 + _HOUR_BONUS[hour]
         
         # Avoid too close to existing meetings
-        slot_end = start_time + timedelta(minutes=duration_minutes)
-        for event in events:
-            # Check if too close to existing events
-            time_before = (start_time - event.end_time).total_seconds() / 60
-            time_after = (event.start_time - slot_end).total_seconds() / 60
-            
-            if 0 < time_before < 15:  # Less than 15 min after an event
-                confidence -= 0.2
-            if 0 < time_after < 15:  # Less than 15 min before an event
-                confidence -= 0.2
+        confidence -= 0.2 * nearby_events
         
         return max(0.1, confidence)  # Minimum confidence of 0.1
     
@@ -200,11 +448,11 @@ class AdvancedCalendarManager:
             'description': description,
             'start': {
                 'dateTime': slot.start_time.isoformat(),
-                'timeZone': str(self.timezone),
+                'timeZone': self._tz_str,
             },
             'end': {
                 'dateTime': slot.end_time.isoformat(),
-                'timeZone': str(self.timezone),
+                'timeZone': self._tz_str,
             },
         }
         
@@ -213,10 +461,11 @@ class AdvancedCalendarManager:
         
         try:
             event = self.service.events().insert(
-                calendarId='primary',
+                calendarId=self.calendar_id,
                 body=event_body,
                 sendUpdates='all' if attendees else 'none'
             ).execute()
+            self._invalidate_events(slot.start_time, slot.end_time)
             
             print(f"✅ Meeting scheduled: {event.get('htmlLink')}")
             return True
@@ -225,12 +474,9 @@ class AdvancedCalendarManager:
             print(f"❌ Failed to schedule meeting: {error}")
             return False
     
-    def suggest_alternative_times(self, original_date: datetime.date, 
-                                 duration_minutes: int) -> List[TimeSlot]:
-        """Suggest alternative times when preferred slot is unavailable"""
-        alternatives = []
-        
-        # Try next few days
+    def _alternative_dates(self, original_date: datetime.date) -> List[datetime.date]:
+        """Candidate days for alternatives: the next 7 days, skipping weekends for weekday requests"""
+        candidate_dates = []
         for days_ahead in range(1, 8):  # Next 7 days
             alt_date = original_date + timedelta(days=days_ahead)
             
@@ -238,35 +484,57 @@ class AdvancedCalendarManager:
             if alt_date.weekday() >= 5 and original_date.weekday() < 5:
                 continue
             
-            slots = self.find_optimal_slots(alt_date, duration_minutes, max_slots=5)
+            candidate_dates.append(alt_date)
+        return candidate_dates
+
+    def _alternative_window(self) -> Tuple[float, float]:
+        """Padded hour window fetched for alternative days, which use default working hours"""
+        work_start, work_end = self._working_hours(None)
+        return work_start - SLOT_BUFFER_HOURS, work_end + SLOT_BUFFER_HOURS
+
+    def _alternatives_from_events(self, candidate_dates: List[datetime.date], duration_minutes: int,
+                                  events_by_date: Dict[datetime.date, List[CalendarEvent]]) -> List[TimeSlot]:
+        """Collect up to 5 alternative slots from pre-fetched candidate days, a few per day"""
+        alternatives = []
+        for alt_date in candidate_dates:
+            slots = self.find_optimal_slots(alt_date, duration_minutes, max_slots=ALTERNATIVE_SLOTS_PER_DAY,
+                                            events=events_by_date[alt_date])
             alternatives.extend(slots)
             
             if len(alternatives) >= 5:  # Return up to 5 alternatives
                 break
         
         return alternatives[:5]
+
+    def suggest_alternative_times(self, original_date: datetime.date, 
+                                 duration_minutes: int) -> List[TimeSlot]:
+        """Suggest alternative times when preferred slot is unavailable"""
+        candidate_dates = self._alternative_dates(original_date)
+        events_by_date = self._batch_fetch_days(candidate_dates, *self._alternative_window(),
+                                                max_results=MAX_EVENTS_PER_REQUEST)
+        return self._alternatives_from_events(candidate_dates, duration_minutes, events_by_date)
     
     def view_events_on(self, day):
         service = self.service
-        utc = pytz.UTC
-        start_of_day = datetime.combine(day, datetime.min.time()).astimezone(utc)
-        end_of_day = datetime.combine(day, datetime.max.time()).astimezone(utc)
+        start_of_day, end_of_day = self._day_bounds_utc(day)
 
         events_result = service.events().list(
-            calendarId="primary",
-            timeMin=start_of_day.isoformat(),
-            timeMax=end_of_day.isoformat(),
+            calendarId=self.calendar_id,
+            timeMin=start_of_day,
+            timeMax=end_of_day,
             singleEvents=True,
             orderBy="startTime",
+            fields=EVENT_FIELDS,
         ).execute()
         events = events_result.get("items", [])
 
+        day_str = day.strftime('%A, %d %B')
         if not events:
-            return f"You have no events scheduled on {day.strftime('%A, %d %B')}."
+            return f"You have no events scheduled on {day_str}."
         
-        response = f"You have {len(events)} event(s) on {day.strftime('%A, %d %B')}:\n"
+        parts = [f"You have {len(events)} event(s) on {day_str}:"]
         for event in events:
             start = event['start'].get('dateTime', event['start'].get('date'))
             summary = event.get("summary", "No title")
-            response += f"- {summary} at {start}\n"
-        return response
\ No newline at end of file
+            parts.append(f"- {summary} at {start}")
+        return "\n".join(parts)
\ No newline at end of file
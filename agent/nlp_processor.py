@@ -1,19 +1,70 @@
 # agent/nlp_processor.py
+import asyncio
 import google.generativeai as genai
+from cachetools import LRUCache
 from datetime import date
-from datetime import datetime
-import json
-from dateutil import parser
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Optional
+import orjson
 import re
 
-class NLPProcessor:
-    def __init__(self, api_key: str):
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel(model_name="gemini-1.5-flash")
-
-
-    def extract_meeting_info(self, user_input: str, context: dict) -> dict:
-        system_prompt = """You are a smart assistant that extracts meeting info from natural language. 
+from utils.date_parser import (
+    fuzzy_parse_date, next_weekday_offset, parse_absolute_date, upcoming_weekday_offset,
+)
+
+# Strips markdown code fences (with or without a json tag) around Gemini's JSON
+_FENCE_RE = re.compile(r"^```(?:json)?|```$", re.MULTILINE)
+
+def _normalize_meeting_info(info: dict) -> dict:
+    """Coerce Gemini's JSON fields to the types the scheduler works with"""
+    duration = info.get("duration_minutes")
+    try:
+        info["duration_minutes"] = int(duration) if duration is not None else None
+    except (TypeError, ValueError):
+        info["duration_minutes"] = None
+
+    time_range = info.get("time_range")
+    try:
+        if isinstance(time_range, dict):
+            info["time_range"] = (float(time_range["start_hour"]), float(time_range["end_hour"]))
+        elif isinstance(time_range, (list, tuple)):
+            start_hour, end_hour = time_range
+            info["time_range"] = (float(start_hour), float(end_hour))
+        else:
+            info["time_range"] = None
+    except (KeyError, TypeError, ValueError):
+        info["time_range"] = None
+
+    preferred_date = info.get("preferred_date")
+    try:
+        info["preferred_date"] = date.fromisoformat(preferred_date) if preferred_date else None
+    except (TypeError, ValueError):
+        info["preferred_date"] = None
+
+    return info
+
+
+# One model is shared across NLPProcessor instances so the underlying gRPC (HTTP/2)
+# channel stays open. genai.configure is process-global, so only one API key is supported.
+_MODEL_NAME = "gemini-1.5-flash"
+_MODEL = None
+_MODEL_API_KEY = None
+
+
+def _shared_model(api_key: str):
+    """Return the process-wide GenerativeModel, configuring genai on first use"""
+    global _MODEL, _MODEL_API_KEY
+    if _MODEL is None:
+        genai.configure(api_key=api_key, transport="grpc")
+        _MODEL = genai.GenerativeModel(model_name=_MODEL_NAME)
+        _MODEL_API_KEY = api_key
+    elif api_key != _MODEL_API_KEY:
+        raise ValueError("NLPProcessor supports a single Gemini API key per process")
+    return _MODEL
+
+
+_SYSTEM_PROMPT = """You are a smart assistant that extracts meeting info from natural language. 
     Return data in JSON with:
     - duration_minutes (int or null)
     - preferred_date (YYYY-MM-DD or null)
@@ -23,11 +74,73 @@ class NLPProcessor:
     - meeting_type (brief, standard, long, all-day)
     """
 
-        full_prompt = f"""{system_prompt}
+# Fast paths tried before falling back to dateutil's fuzzy parser
+_RELATIVE_DAY_RE = re.compile(r"\b(day after tomorrow|today|tomorrow|yesterday)\b")
+_RELATIVE_DAY_OFFSETS = {"today": 0, "tomorrow": 1, "day after tomorrow": 2, "yesterday": -1}
+_WEEKDAY_RE = re.compile(
+    r"\b(?:(next|last)\s+)?(monday|tuesday|wednesday|thursday|friday|saturday|sunday|mon|tue|wed|thu|fri|sat|sun)\b"
+)
+_WEEKDAY_INDEX = {"mon": 0, "tue": 1, "wed": 2, "thu": 3, "fri": 4, "sat": 5, "sun": 6}
+
+
+@lru_cache(maxsize=256)
+def _extract_date(text: str, today: date) -> Optional[date]:
+    """Resolve a date from normalized text; today is part of the cache key"""
+    try:
+        return date.fromisoformat(text)
+    except ValueError:
+        pass
+
+    # An explicit date anywhere in the text wins over a weekday or relative word next to it
+    absolute = parse_absolute_date(text, today)
+    if absolute:
+        return absolute
+
+    match = _RELATIVE_DAY_RE.search(text)
+    if match:
+        return today + timedelta(days=_RELATIVE_DAY_OFFSETS[match.group(1)])
+
+    match = _WEEKDAY_RE.search(text)
+    if match:
+        modifier, weekday = match.groups()
+        target_weekday = _WEEKDAY_INDEX[weekday[:3]]
+        offset = target_weekday - today.weekday()
+        if modifier == "next":  # Same rule as AdvancedDateParser: always the following week
+            days_ahead = next_weekday_offset(target_weekday, today.weekday())
+        elif modifier == "last":
+            days_ahead = offset - 7 if offset >= 0 else offset
+        else:
+            days_ahead = upcoming_weekday_offset(target_weekday, today.weekday())
+        return today + timedelta(days=days_ahead)
+
+    return fuzzy_parse_date(text, today)
+
+
+class NLPProcessor:
+    def __init__(self, api_key: str):
+        self.model = _shared_model(api_key)
+
+        # Extraction results keyed on (normalized input, state, known duration, today)
+        self._extract_cache = LRUCache(maxsize=128)
+
+    def _serialize_context(self, context: dict) -> str:
+        """JSON-encode the prompt context; dates and other non-JSON values fall back to str()"""
+        return orjson.dumps(context, default=str).decode()
+
+    def extract_meeting_info(self, user_input: str, context: dict) -> dict:
+        today_iso = date.today().isoformat()
+        meeting_request = context.get("meeting_request") or {}
+        cache_key = (user_input.lower().strip(), context.get("current_state"),
+                     meeting_request.get("duration_minutes"), today_iso)
+        cached = self._extract_cache.get(cache_key)
+        if cached is not None:
+            return dict(cached)
+
+        full_prompt = f"""{_SYSTEM_PROMPT}
 
     User input: "{user_input}"
-    Today's date: {date.today().isoformat()}
-    Context: {json.dumps(context, default=str)}
+    Today's date: {today_iso}
+    Context: {self._serialize_context(context)}
     """
 
         try:
@@ -43,10 +156,12 @@ class NLPProcessor:
                     raise ValueError("Gemini returned no usable content.")
 
             # ✅ Clean markdown-wrapped JSON
-            cleaned = re.sub(r"^```json|```$", "", content.strip(), flags=re.MULTILINE).strip()
+            cleaned = _FENCE_RE.sub("", content.strip()).strip()
 
-            # Parse and return as dict
-            return json.loads(cleaned)
+            # Parse and return as dict; failures below are never cached
+            info = _normalize_meeting_info(orjson.loads(cleaned))
+            self._extract_cache[cache_key] = info
+            return dict(info)
 
         except Exception as e:
             print("Gemini error:", e)
@@ -55,12 +170,16 @@ class NLPProcessor:
 
 
 
+    async def extract_meeting_info_async(self, user_input: str, context: dict) -> dict:
+        """Run extract_meeting_info in a worker thread so other I/O can overlap the Gemini call"""
+        return await asyncio.to_thread(self.extract_meeting_info, user_input, context)
+
     def generate_response(self, state: str, context: dict, user_input: str) -> str:
         try:
             prompt = f"""You are a friendly scheduling assistant. 
 
 State: {state}
-Context: {json.dumps(context, default=str)}
+Context: {self._serialize_context(context)}
 User said: "{user_input}"
 
 Reply helpfully and clearly based on the context.
@@ -73,9 +192,6 @@ Reply helpfully and clearly based on the context.
         
 
     def extract_date(self, user_input: str):
-        """Extracts a date from user input using fuzzy parsing"""
-        try:
-            return parser.parse(user_input, fuzzy=True).date()
-        except:
-            return None
+        """Extracts a date from user input, trying cheap fast paths before fuzzy parsing"""
+        return _extract_date(user_input.lower().strip(), date.today())
 
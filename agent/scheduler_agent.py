@@ -1,15 +1,47 @@
+import asyncio
 from enum import Enum
-from typing import Dict, List, Optional
+from typing import Deque, Dict, List, Optional
 import os
-from datetime import datetime, date
-from dataclasses import dataclass, asdict
-from dateutil import parser
+import re
+from collections import deque
+from datetime import datetime, date, timedelta
+from dataclasses import dataclass, fields
 
 from .nlp_processor import NLPProcessor
 from .voice_handler import VoiceHandler
 from .calendar_integration import AdvancedCalendarManager, TimeSlot
 from utils.date_parser import AdvancedDateParser
 
+# Spoken option references, matched as whole words in a single regex pass
+_WORD2NUM = {
+    "one": 1, "first": 1,
+    "two": 2, "second": 2,
+    "three": 3, "third": 3,
+    "four": 4, "fourth": 4,
+    "five": 5, "fifth": 5,
+}
+_OPT_RE = re.compile(r"\b(?P<d>[1-5])\b|\b(?P<w>" + "|".join(_WORD2NUM) + r")\b")
+
+# Bare yes/no and option picks carry nothing for Gemini to extract
+_OPTION_WORDS = "[1-5]|" + "|".join(_WORD2NUM)
+_SHORT_REPLY_RE = re.compile(
+    r"(?:yes|yeah|yep|sure|ok(?:ay)?|no|nope"
+    rf"|(?:(?:option|number)\s+)?(?:{_OPTION_WORDS})"
+    rf"|(?:the\s+)?(?:{_OPTION_WORDS})\s+one)"
+)
+
+# Exchanges kept for the session log; older ones are dropped
+_HISTORY_LIMIT = 64
+
+# Whole-word exit commands, so e.g. "stopwatch" doesn't end the session
+_EXIT_WORDS = frozenset({"goodbye", "bye", "thanks", "exit", "quit", "stop"})
+
+# Keyword checks run every turn; one alternation each instead of a scan per phrase
+_MEETING_RE = re.compile(r"schedule|meeting|book|plan|appointment|call")
+_SCHEDQ_RE = re.compile(
+    r"do i have|what's on|am i busy|anything on|my schedule|calendar for|am i free|am i available"
+)
+
 class ConversationState(Enum):
     GREETING = "greeting"
     COLLECTING_DURATION = "collecting_duration"
@@ -20,6 +52,12 @@ class ConversationState(Enum):
     HANDLING_CONFLICT = "handling_conflict"
     COMPLETE = "complete"
 
+# States whose next step searches the calendar, so a prefetch during extraction pays off
+_SLOT_SEARCH_STATES = frozenset({
+    ConversationState.COLLECTING_TIME_PREFERENCE,
+    ConversationState.HANDLING_CONFLICT,
+})
+
 @dataclass
 class MeetingRequest:
     duration_minutes: Optional[int] = None
@@ -35,10 +73,12 @@ class MeetingRequest:
             self.attendees = []
 
 class SmartSchedulerAgent:
-    def __init__(self, gemini_api_key, google_calendar_service, timezone="UTC"):
+    def __init__(self, gemini_api_key, google_calendar_service, timezone="UTC",
+                 google_calendar_credentials=None):
         self.nlp = NLPProcessor(api_key=gemini_api_key)
         self.voice = VoiceHandler()
-        self.calendar_manager = AdvancedCalendarManager(google_calendar_service, timezone)
+        self.calendar_manager = AdvancedCalendarManager(google_calendar_service, timezone,
+                                                        credentials=google_calendar_credentials)
         self.date_parser = AdvancedDateParser()
 
         self.last_suggested_slots = []
@@ -48,8 +88,10 @@ class SmartSchedulerAgent:
         # Conversation state
         self.state = ConversationState.GREETING
         self.meeting_request = MeetingRequest()
+        self._request_dict = self._snapshot_request()
         self.current_options: List[TimeSlot] = []
-        self.conversation_history: List[Dict] = []
+        self.conversation_history: Deque[Dict] = deque(maxlen=_HISTORY_LIMIT)
+        self._recent_history = deque(maxlen=3)  # Last 3 exchanges, sent as NLP context
         
         # Configuration
         self.max_retries = 3
@@ -57,14 +99,13 @@ class SmartSchedulerAgent:
     
     def extract_date(self, user_input: str):
         """Extract a date from user text using simple parsing"""
-        try:
-            return parser.parse(user_input, fuzzy=True).date()
-        except:
-            return None
+        return self.nlp.extract_date(user_input)
     
     def start_conversation(self):
         """Main conversation loop"""
         self.voice.speak("Hello! I'm your smart scheduling assistant. I can help you find and schedule meetings. What would you like to do?")
+        # Capture and transcribe on a background thread while we process and speak
+        self.voice.start_background_listening()
         
         while self.state != ConversationState.COMPLETE:
             try:
@@ -75,13 +116,15 @@ class SmartSchedulerAgent:
                     self.handle_speech_error()
                     continue
                 
+                ui_lower = user_input.lower()
+                
                 # Handle exit commands
-                if any(exit_word in user_input for exit_word in ["goodbye", "thanks","exit", "quit", "stop"]):
+                if _EXIT_WORDS.intersection(ui_lower.split()):
                     self.voice.speak("Goodbye! Have a great day!")
                     break
 
                 # ✅ Check if user selected an option
-                option_num = self.extract_option_number(user_input)
+                option_num = self.extract_option_number(ui_lower)
                 if option_num and self.last_suggested_slots:
                     index = option_num - 1
                     if 0 <= index < len(self.last_suggested_slots):
@@ -106,12 +149,14 @@ class SmartSchedulerAgent:
                     self.voice.speak(response)
 
                 # Log conversation
-                self.conversation_history.append({
+                entry = {
                     "user": user_input,
                     "bot": response,
                     "state": self.state.value,
                     "timestamp": datetime.now().isoformat()
-                })
+                }
+                self.conversation_history.append(entry)
+                self._recent_history.append(entry)
 
                 # Reset retry counter
                 self.current_retries = 0
@@ -128,36 +173,41 @@ class SmartSchedulerAgent:
                     self.voice.speak("I'm having trouble understanding. Let's start over.")
                     self.reset_conversation()
 
+        # Speech plays in the background; let the last reply finish before returning
+        self.voice.stop_background_listening()
+        self.voice.wait_until_done()
+
     
     def process_user_input(self, user_input: str) -> str:
         """Process user input based on current conversation state"""
+        ui_lower = user_input.lower()
         
         # Extract information using NLP
-        context = {
-            "current_state": self.state.value,
-            "meeting_request": asdict(self.meeting_request),
-            "conversation_history": self.conversation_history[-3:],  # Last 3 exchanges
-        }
+        context = self._nlp_context()
         
-        extracted_info = self.nlp.extract_meeting_info(user_input, context)
+        if (self.state in (ConversationState.SHOWING_OPTIONS, ConversationState.CONFIRMING_SELECTION)
+                and _SHORT_REPLY_RE.fullmatch(ui_lower.strip())):
+            extracted_info = {}  # Skip the Gemini round trip for a bare selection or yes/no
+        else:
+            # Only warm the calendar cache when this turn can lead to a slot search
+            prefetch = (self.state in _SLOT_SEARCH_STATES) or bool(_SCHEDQ_RE.search(ui_lower))
+            extracted_info = asyncio.run(self._extract_with_prefetch(user_input, context, prefetch))
         
         # Update meeting request with extracted info
         self.update_meeting_request(extracted_info)
         
-        if any(phrase in user_input.lower() for phrase in [
-            "do i have", "what's on", "am i busy", "anything on", "my schedule", "calendar for", "am i free", "am i available"
-        ]):
+        if _SCHEDQ_RE.search(ui_lower):
             date = self.nlp.extract_date(user_input)
             if date:
-                if "evening" in user_input.lower():
-                    preferred_range = {"start_hour": 17, "end_hour": 21}
-                elif "morning" in user_input.lower():
-                    preferred_range = {"start_hour": 8, "end_hour": 12}
-                elif "afternoon" in user_input.lower():
-                    preferred_range = {"start_hour": 12, "end_hour": 17}
+                if "evening" in ui_lower:
+                    preferred_range = (17, 21)
+                elif "morning" in ui_lower:
+                    preferred_range = (8, 12)
+                elif "afternoon" in ui_lower:
+                    preferred_range = (12, 17)
                 else:
                     # Default to full workday
-                    preferred_range = {"start_hour": 9, "end_hour": 17}
+                    preferred_range = (9, 17)
 
                 free_slots = self.calendar_manager.find_optimal_slots(
                     target_date=date,
@@ -177,25 +227,36 @@ class SmartSchedulerAgent:
 
         # Handle based on current state
         if self.state == ConversationState.GREETING:
-            return self.handle_greeting(user_input)
+            return self.handle_greeting(ui_lower)
         elif self.state == ConversationState.COLLECTING_DURATION:
             return self.handle_duration_collection(user_input, extracted_info)
         elif self.state == ConversationState.COLLECTING_TIME_PREFERENCE:
             return self.handle_time_preference_collection(user_input, extracted_info)
         elif self.state == ConversationState.SHOWING_OPTIONS:
-            return self.handle_option_selection(user_input)
+            return self.handle_option_selection(ui_lower)
         elif self.state == ConversationState.CONFIRMING_SELECTION:
-            return self.handle_confirmation(user_input)
+            return self.handle_confirmation(ui_lower)
         elif self.state == ConversationState.HANDLING_CONFLICT:
             return self.handle_conflict_resolution(user_input)
         else:
             return "I'm not sure how to help with that. Could you please try again?"
     
-    def handle_greeting(self, user_input: str) -> str:
-        """Handle initial greeting and meeting request detection"""
-        meeting_keywords = ['schedule', 'meeting', 'book', 'plan', 'appointment', 'call']
-        
-        if any(keyword in user_input.lower() for keyword in meeting_keywords):
+    async def _extract_with_prefetch(self, user_input: str, context: Dict, prefetch: bool = True) -> Dict:
+        """Run Gemini extraction, optionally warming the calendar cache for the next few days"""
+        extract_task = asyncio.create_task(self.nlp.extract_meeting_info_async(user_input, context))
+        if not prefetch:
+            return await extract_task
+        today = date.today()
+        # prefetch_days_async bounds its own wait, so a stalled Calendar socket can't hold up the reply
+        prefetch_task = asyncio.create_task(
+            self.calendar_manager.prefetch_days_async([today + timedelta(days=i) for i in range(3)])
+        )
+        extracted_info, _ = await asyncio.gather(extract_task, prefetch_task)
+        return extracted_info
+    
+    def handle_greeting(self, ui_lower: str) -> str:
+        """Handle initial greeting and meeting request detection (expects lower-cased input)"""
+        if _MEETING_RE.search(ui_lower):
             if self.meeting_request.duration_minutes:
                 self.state = ConversationState.COLLECTING_TIME_PREFERENCE
                 return f"Great! I see you want to schedule a {self.meeting_request.duration_minutes}-minute meeting. When would you like to meet?"
@@ -219,7 +280,7 @@ class SmartSchedulerAgent:
             # Try to parse date from user input
             parsed_date = self.date_parser.parse_complex_date(user_input)
             if parsed_date:
-                self.meeting_request.preferred_date = parsed_date
+                self._set_request_field("preferred_date", parsed_date)
             else:
                 return "I didn't understand the date. Could you try again? For example, 'tomorrow afternoon', 'next Tuesday', or 'this Friday morning'."
 
@@ -233,7 +294,8 @@ class SmartSchedulerAgent:
 
         if not slots:
             self.state = ConversationState.HANDLING_CONFLICT
-            return "Sorry, I couldn't find any open slots for that time. Would you like to try another day?"
+            # Search the following days in one batched calendar request instead of waiting for another turn
+            return self.handle_no_slots_available()
 
         # ✅ Store slots so user can later say "Option 1"
         self.last_suggested_slots = slots
@@ -287,6 +349,9 @@ class SmartSchedulerAgent:
         )
         
         if alternatives:
+            # Only the slots read out can be picked; "option N" books straight from last_suggested_slots
+            alternatives = alternatives[:3]
+            self.last_suggested_slots = alternatives
             self.current_options = alternatives
             self.state = ConversationState.SHOWING_OPTIONS
             
@@ -294,7 +359,7 @@ class SmartSchedulerAgent:
             response = f"I don't have any {self.meeting_request.duration_minutes}-minute slots available on {date_str}. "
             response += "But I found these alternatives:\n\n"
             
-            for i, slot in enumerate(alternatives[:3], 1):
+            for i, slot in enumerate(alternatives, 1):
                 response += f"{i}. {slot}\n"
             
             response += "\nWould any of these work for you?"
@@ -302,31 +367,23 @@ class SmartSchedulerAgent:
         else:
             return f"I'm sorry, I couldn't find any {self.meeting_request.duration_minutes}-minute slots in the next week. Would you like to try a shorter meeting duration or a different time range?"
     
-    def handle_option_selection(self, user_input: str) -> str:
-        """Handle user selecting from presented options"""
+    def handle_option_selection(self, ui_lower: str) -> str:
+        """Handle user selecting from presented options (expects lower-cased input)"""
         # Try to extract selection number
-        selection = self.extract_selection_number(user_input)
+        selection = self.extract_option_number(ui_lower)
         
         if selection and 1 <= selection <= len(self.current_options):
             selected_slot = self.current_options[selection - 1]
-            self.meeting_request.preferred_date = selected_slot.start_time.date()
+            self._set_request_field("preferred_date", selected_slot.start_time.date())
             self.selected_slot = selected_slot
             self.state = ConversationState.CONFIRMING_SELECTION
             return f"Got it! You selected: {selected_slot}. Should I go ahead and schedule this meeting?"
         else:
             return "I'm not sure which option you selected. Please say the number of the option you'd like, like 'Option 1' or 'the second one'."
-        
-    def extract_selection_number(self, text: str) -> Optional[int]:
-        """Extracts a number from user input indicating a slot selection"""
-        import re
-        match = re.search(r'\b(\d+)\b', text)
-        if match:
-            return int(match.group(1))
-        return None
-
-    def handle_confirmation(self, user_input: str) -> str:
-        """Handle user confirming meeting selection"""
-        if "yes" in user_input.lower():
+
+    def handle_confirmation(self, ui_lower: str) -> str:
+        """Handle user confirming meeting selection (expects lower-cased input)"""
+        if "yes" in ui_lower:
             self.state = ConversationState.SCHEDULING
             success = self.calendar_manager.schedule_meeting(
                 self.selected_slot,
@@ -338,7 +395,7 @@ class SmartSchedulerAgent:
                 return "Your meeting has been successfully scheduled. Anything else I can help you with?"
             else:
                 return "I tried to schedule the meeting but ran into an issue. Would you like to try another time?"
-        elif "no" in user_input.lower():
+        elif "no" in ui_lower:
             self.state = ConversationState.SHOWING_OPTIONS
             return "No problem. Please select another available time slot."
         else:
@@ -346,11 +403,7 @@ class SmartSchedulerAgent:
 
     def handle_conflict_resolution(self, user_input: str) -> str:
         # 👇 Reprocess user's follow-up input
-        extracted_info = self.nlp.extract_meeting_info(user_input, {
-            "current_state": self.state.value,
-            "meeting_request": asdict(self.meeting_request),
-            "conversation_history": self.conversation_history[-3:]
-        })
+        extracted_info = self.nlp.extract_meeting_info(user_input, self._nlp_context())
         
         self.update_meeting_request(extracted_info)
 
@@ -359,23 +412,16 @@ class SmartSchedulerAgent:
             return self.find_and_present_options()
 
         return "Would you like to try a shorter meeting or a different time range?"
-
-        
-    def extract_selection_number(self, text: str) -> Optional[int]:
-        """Extracts a number from user input indicating a slot selection"""
-        import re
-        match = re.search(r'\b(\d+)\b', text)
-        if match:
-            return int(match.group(1))
-        return None
     
     def reset_conversation(self):
         """Reset the agent to start a new conversation"""
         self.state = ConversationState.GREETING
         self.meeting_request = MeetingRequest()
+        self._request_dict = self._snapshot_request()
         self.current_options = []
         self.selected_slot = None
-        self.conversation_history = []
+        self.conversation_history.clear()
+        self._recent_history.clear()
         self.current_retries = 0
         self.voice.speak("Let's start fresh. What can I help you schedule today?")
 
@@ -384,14 +430,27 @@ class SmartSchedulerAgent:
         if not extracted_info:
             return
 
-        self.meeting_request.duration_minutes = extracted_info.get("duration_minutes") or self.meeting_request.duration_minutes
-        self.meeting_request.preferred_date = (
-            datetime.strptime(extracted_info["preferred_date"], "%Y-%m-%d").date()
-            if extracted_info.get("preferred_date") else self.meeting_request.preferred_date
-        )
-        self.meeting_request.time_range = extracted_info.get("time_range") or self.meeting_request.time_range
-        self.meeting_request.flexibility = extracted_info.get("flexibility") or self.meeting_request.flexibility
-        self.meeting_request.urgency = extracted_info.get("urgency") or self.meeting_request.urgency
+        for name in ("duration_minutes", "preferred_date", "time_range", "flexibility", "urgency"):
+            value = extracted_info.get(name)
+            if value:
+                self._set_request_field(name, value)
+
+    def _snapshot_request(self) -> Dict:
+        """Shallow dict of the current meeting request, kept in sync by _set_request_field"""
+        return {f.name: getattr(self.meeting_request, f.name) for f in fields(MeetingRequest)}
+
+    def _set_request_field(self, name: str, value):
+        """Set a meeting request field and mirror it into the NLP context dict"""
+        setattr(self.meeting_request, name, value)
+        self._request_dict[name] = value
+
+    def _nlp_context(self) -> Dict:
+        """Context sent to the NLP processor for the current turn"""
+        return {
+            "current_state": self.state.value,
+            "meeting_request": self._request_dict,
+            "conversation_history": list(self._recent_history),
+        }
     def handle_speech_error(self):
         """Handle speech recognition failures gracefully"""
         self.current_retries += 1
@@ -401,20 +460,12 @@ class SmartSchedulerAgent:
         else:
             self.voice.speak("Sorry, I didn't catch that. Could you please repeat?")
 
-    def extract_option_number(self, user_input: str) -> Optional[int]:
-        """Extracts option number from user speech like 'one', 'option 2', etc."""
-        word_to_num = {
-            "one": 1, "first": 1, "1": 1,
-            "two": 2, "second": 2, "2": 2,
-            "three": 3, "third": 3, "3": 3,
-            "four": 4, "fourth": 4, "4": 4,
-            "five": 5, "fifth": 5, "5": 5,
-        }
-        user_input = user_input.lower()
-        for key, val in word_to_num.items():
-            if key in user_input:
-                return val
-        return None
+    def extract_option_number(self, ui_lower: str) -> Optional[int]:
+        """Extracts option number from lower-cased user speech like 'one', 'option 2', etc."""
+        match = _OPT_RE.search(ui_lower)
+        if not match:
+            return None
+        return int(match["d"]) if match["d"] else _WORD2NUM[match["w"]]
     
 
 
@@ -1,49 +1,242 @@
 import speech_recognition as sr
 import pyttsx3
+import re
 import threading
 import queue
+import time
 from typing import Optional
 
+# Sentence boundaries used to hand speech to the TTS worker in small pieces
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+
 class VoiceHandler:
-    def __init__(self, rate: int = 200, volume: float = 0.9):
+    def __init__(self, rate: int = 200, volume: float = 0.9, barge_in: bool = False):
         self.recognizer = sr.Recognizer()
         self.microphone = sr.Microphone()
+        self.rate = rate
+        self.volume = volume
         
-        # Initialize TTS
-        self.tts_engine = pyttsx3.init()
-        self.tts_engine.setProperty('rate', rate)
-        self.tts_engine.setProperty('volume', volume)
+        # Speech queue consumed by the TTS worker thread, one (generation, sentence) per item.
+        # Interrupting bumps the generation; the worker skips stale sentences and stops
+        # the one playing from inside the engine's own word callback.
+        self.speech_queue = queue.Queue()
+        self._generation = 0
+        self._playing_generation = 0
+        self.is_speaking = threading.Event()
+        self._speech_lock = threading.Lock()
+        self._speech_ended_at = 0.0
         
-        # Voice selection (optional - try different voices)
-        voices = self.tts_engine.getProperty('voices')
-        if voices:
-            # Try to use a more natural voice
-            self.tts_engine.setProperty('voice', voices[0].id)
+        # Background listening: finalized transcripts land in user_text_q.
+        # Without echo cancellation the mic also hears the bot, so phrases that
+        # overlap playback are dropped unless barge_in is enabled, in which case
+        # they cut the bot off instead.
+        self.barge_in = barge_in
+        self.user_text_q = queue.Queue()
+        self._stop_listening = None
+        # Recognition failures are only reported while listen() is waiting for a reply;
+        # between turns they are almost always background noise
+        self._awaiting_reply = threading.Event()
+        # Set from the moment a phrase starts until its transcript is queued, so the
+        # reply timeout only covers the wait for the user to start talking
+        self._phrase_in_progress = threading.Event()
         
-        # Speech queue for handling interruptions
-        self.speech_queue = queue.Queue()
-        self.is_speaking = False
+        # Calibrate the microphone in the background while the TTS engine loads. The
+        # worker holds playback until this is done so the bot's own voice is not
+        # sampled as ambient noise, and anything that opens the mic waits for it too.
+        self._calibrated = threading.Event()
+        threading.Thread(target=self._calibrate, daemon=True).start()
         
-        # Calibrate microphone
-        with self.microphone as source:
-            self.recognizer.adjust_for_ambient_noise(source, duration=1)
+        # pyttsx3 engines must be driven from the thread that created them,
+        # so the worker owns the engine for its whole lifetime
+        self._engine_ready = threading.Event()
+        self._engine_error = None
+        self._tts_thread = threading.Thread(target=self._tts_worker, daemon=True)
+        self._tts_thread.start()
+        self._engine_ready.wait()
+        if self._engine_error:
+            raise self._engine_error
+    
+    def _calibrate(self):
+        """Sample ambient noise once to set the recognizer's energy threshold"""
+        try:
+            with self.microphone as source:
+                self.recognizer.adjust_for_ambient_noise(source, duration=1)
+        except Exception as e:
+            print(f"⚠️ Microphone calibration failed: {e}")
+        finally:
+            self._calibrated.set()
     
-    def speak(self, text: str, interrupt_current: bool = True):
-        """Speak text with interruption handling"""
-        if interrupt_current and self.is_speaking:
+    def _tts_worker(self):
+        """Own the TTS engine and speak queued sentences in order"""
+        try:
+            self.tts_engine = pyttsx3.init()
+            self.tts_engine.setProperty('rate', self.rate)
+            self.tts_engine.setProperty('volume', self.volume)
+            
+            # Voice selection (optional - try different voices)
+            voices = self.tts_engine.getProperty('voices')
+            if voices:
+                # Try to use a more natural voice
+                self.tts_engine.setProperty('voice', voices[0].id)
+            self.tts_engine.connect('started-word', self._on_word)
+        except Exception as e:
+            self._engine_error = e
+            return
+        finally:
+            self._engine_ready.set()
+        
+        self._calibrated.wait()
+        while True:
+            generation, sentence = self.speech_queue.get()
+            try:
+                if generation == self._generation:
+                    self._playing_generation = generation
+                    self.tts_engine.say(sentence)
+                    self.tts_engine.runAndWait()
+            except Exception as e:
+                print(f"❌ TTS error: {e}")
+            finally:
+                with self._speech_lock:
+                    self.speech_queue.task_done()
+                    if self.speech_queue.empty():
+                        self.is_speaking.clear()
+                        self._speech_ended_at = time.monotonic()
+    
+    def _on_word(self, name, location, length):
+        """Engine callback on the worker thread: cut the current sentence short once interrupted"""
+        if self._playing_generation != self._generation:
             self.tts_engine.stop()
+    
+    def _interrupt(self):
+        """Ask the TTS worker to stop playback; the engine itself is only touched by the worker"""
+        with self._speech_lock:
+            self._generation += 1
+        self._drain_speech_queue()
+    
+    def speak(self, text: str, interrupt_current: bool = False):
+        """Queue text for speech and return without waiting for playback"""
+        if interrupt_current and self.is_speaking.is_set():
+            self._interrupt()
         
-        self.is_speaking = True
         print(f"🤖 Bot: {text}")
         
+        sentences = [s for s in _SENTENCE_SPLIT_RE.split(text) if s.strip()]
+        with self._speech_lock:
+            if sentences:
+                self.is_speaking.set()
+            for sentence in sentences:
+                self.speech_queue.put((self._generation, sentence))
+    
+    def _drain_speech_queue(self):
+        """Drop sentences that have not started playing yet"""
+        while True:
+            try:
+                self.speech_queue.get_nowait()
+            except queue.Empty:
+                return
+            self.speech_queue.task_done()
+    
+    def wait_until_done(self):
+        """Block until everything queued so far has been spoken"""
+        self.speech_queue.join()
+    
+    def start_background_listening(self, phrase_time_limit: int = 15):
+        """Keep the mic open on a background thread so capture overlaps playback and processing"""
+        if self._stop_listening is None:
+            self._calibrated.wait()
+            running = threading.Event()
+            running.set()
+            threading.Thread(
+                target=self._listen_loop, args=(running, phrase_time_limit), daemon=True
+            ).start()
+            self._stop_listening = running.clear
+    
+    def stop_background_listening(self):
+        """Stop the background mic thread started by start_background_listening"""
+        if self._stop_listening is not None:
+            self._stop_listening()
+            self._stop_listening = None
+    
+    def _listen_loop(self, running: threading.Event, phrase_time_limit: int):
+        """Background mic thread: record phrases and flag when one starts"""
+        with self.microphone as source:
+            while running.is_set():
+                try:
+                    # Streaming yields the first chunk as soon as speech starts;
+                    # the 1 second wait lets the loop notice a stop request
+                    chunks = self.recognizer.listen(
+                        source, timeout=1, phrase_time_limit=phrase_time_limit, stream=True
+                    )
+                    frames = [next(chunks).frame_data]
+                    self._phrase_in_progress.set()
+                    frames.extend(chunk.frame_data for chunk in chunks)
+                except (sr.WaitTimeoutError, StopIteration):
+                    # No phrase started, or it was too short to count
+                    self._phrase_in_progress.clear()
+                    continue
+                try:
+                    if running.is_set():
+                        audio = sr.AudioData(b"".join(frames), source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+                        self._on_phrase(self.recognizer, audio)
+                finally:
+                    self._phrase_in_progress.clear()
+    
+    def _on_phrase(self, recognizer, audio):
+        """Background callback: transcribe a finished phrase and hand it to the dialog loop"""
+        # Anything escaping here would silently kill the background mic thread
         try:
-            self.tts_engine.say(text)
-            self.tts_engine.runAndWait()
-        finally:
-            self.is_speaking = False
+            duration = len(audio.frame_data) / (audio.sample_rate * audio.sample_width)
+            captured_at = time.monotonic() - duration
+            if self.is_speaking.is_set() or captured_at < self._speech_ended_at:
+                if not self.barge_in:
+                    return  # Most likely the bot hearing itself
+                self._interrupt()
+            
+            text = recognizer.recognize_google(audio)
+            print(f"👤 User: {text}")
+            self.user_text_q.put(text.lower().strip())
+        except sr.UnknownValueError:
+            if self._awaiting_reply.is_set():
+                print("❓ Could not understand audio")
+                self.user_text_q.put("could not understand")
+        except sr.RequestError as e:
+            print(f"❌ Speech recognition error: {e}")
+            if self._awaiting_reply.is_set():
+                self.user_text_q.put("recognition error")
+        except Exception as e:
+            print(f"❌ Unexpected error: {e}")
+            if self._awaiting_reply.is_set():
+                self.user_text_q.put("error")
     
     def listen(self, timeout: int = 10, phrase_time_limit: int = 15) -> Optional[str]:
         """Listen for speech with improved error handling"""
+        if self._stop_listening is not None:
+            # Background mode: a barge-in may already have produced a transcript
+            try:
+                return self.user_text_q.get_nowait()
+            except queue.Empty:
+                pass
+            # Otherwise the reply timeout starts once the bot stops talking
+            self.wait_until_done()
+            self._awaiting_reply.set()
+            try:
+                # Like the blocking path, the timeout only covers the wait for speech
+                # to start; a phrase already underway is allowed to finish
+                deadline = time.monotonic() + timeout
+                while True:
+                    in_progress = self._phrase_in_progress.is_set()
+                    try:
+                        return self.user_text_q.get(timeout=0.1)
+                    except queue.Empty:
+                        if not in_progress and time.monotonic() >= deadline:
+                            print("⏰ No speech detected")
+                            return None
+            finally:
+                self._awaiting_reply.clear()
+        
+        # Don't open the mic while the bot is still talking, or it will hear itself
+        self.wait_until_done()
+        self._calibrated.wait()
         print(" Listening...")
         
         try:
@@ -81,4 +274,5 @@ class VoiceHandler:
         if response:
             self.speak(f"I heard you say: {response}")
         else:
-            self.speak("I didn't hear anything, but the microphone is working.")
\ No newline at end of file
+            self.speak("I didn't hear anything, but the microphone is working.")
+        self.wait_until_done()
@@ -3,19 +3,23 @@
 import os
 from config import settings
 from agent import SmartSchedulerAgent
-from agent.auth import authenticate_google_calendar
+from agent.auth import authenticate_google_calendar, get_calendar_credentials
 
 def main():
     # Authenticate with Google Calendar
     google_calendar_service = authenticate_google_calendar(
         credentials_path=settings.GOOGLE_CALENDAR_CREDENTIALS_PATH
     )
+    google_calendar_credentials = get_calendar_credentials(
+        credentials_path=settings.GOOGLE_CALENDAR_CREDENTIALS_PATH
+    )
 
     # Initialize the smart scheduler agent 
     agent = SmartSchedulerAgent(
         gemini_api_key=settings.GEMINI_API_KEY, 
         google_calendar_service=google_calendar_service,
-        timezone=settings.DEFAULT_TIMEZONE
+        timezone=settings.DEFAULT_TIMEZONE,
+        google_calendar_credentials=google_calendar_credentials
     )
 
     # Start the voice-based interaction
@@ -0,0 +1,77 @@
+from datetime import date
+
+import pytest
+
+from agent.nlp_processor import _extract_date
+from utils.date_parser import AdvancedDateParser, parse_absolute_date
+
+# A Wednesday
+TODAY = date(2026, 10, 14)
+
+
+@pytest.fixture
+def parser(monkeypatch):
+    monkeypatch.setattr(AdvancedDateParser, "today", property(lambda self: TODAY))
+    return AdvancedDateParser()
+
+
+# Explicit dates must win over a weekday mentioned in the same sentence
+EXPLICIT_DATE_CASES = [
+    ("am i free on friday, november 20th", date(2026, 11, 20)),
+    ("do i have anything on monday december 7", date(2026, 12, 7)),
+    ("am i busy on 2026-11-20 friday", date(2026, 11, 20)),
+    ("schedule it on friday november 20", date(2026, 11, 20)),
+    ("tomorrow, nov 5 2027", date(2027, 11, 5)),
+    ("am i free on friday the 23rd", date(2026, 10, 23)),
+    ("monday the 2nd", date(2026, 10, 2)),
+]
+
+RELATIVE_CASES = [
+    ("tomorrow", date(2026, 10, 15)),
+    ("day after tomorrow", date(2026, 10, 16)),
+    ("friday", date(2026, 10, 16)),
+    ("wednesday", TODAY),  # A bare weekday that is today means today
+    ("next wednesday", date(2026, 10, 21)),
+    ("next monday", date(2026, 10, 19)),
+]
+
+
+@pytest.mark.parametrize("text, expected", EXPLICIT_DATE_CASES + RELATIVE_CASES)
+def test_extract_date(text, expected):
+    assert _extract_date(text, TODAY) == expected
+
+
+@pytest.mark.parametrize("text, expected", EXPLICIT_DATE_CASES + RELATIVE_CASES)
+def test_parse_complex_date(parser, text, expected):
+    assert parser.parse_complex_date(text) == expected
+
+
+def test_parsers_agree_on_bare_weekdays(parser):
+    for weekday in ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]:
+        assert parser.parse_complex_date(weekday) == _extract_date(weekday, TODAY)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("this friday", date(2026, 10, 16)),
+    ("this wednesday", date(2026, 10, 21)),
+    ("in 3 days", date(2026, 10, 17)),
+    ("2 days from now", date(2026, 10, 16)),
+    ("late next week", date(2026, 10, 24)),
+])
+def test_parse_complex_date_patterns(parser, text, expected):
+    assert parser.parse_complex_date(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("November 5th, 2025", date(2025, 11, 5)),
+    ("sept 3", date(2026, 9, 3)),
+    ("on 5/11", date(2026, 11, 5)),
+    ("05/11/25", date(2025, 11, 5)),
+    ("meet 2027-01-02 at noon", date(2027, 1, 2)),
+    ("the 23rd", date(2026, 10, 23)),
+    ("on the 2nd", date(2026, 10, 2)),
+    ("feb 30", None),
+    ("no date here", None),
+])
+def test_parse_absolute_date(text, expected):
+    assert parse_absolute_date(text, TODAY) == expected
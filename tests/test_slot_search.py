@@ -0,0 +1,347 @@
+import asyncio
+import bisect
+import math
+import random
+from datetime import date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from agent.calendar_integration import (
+    ALTERNATIVE_SLOTS_PER_DAY, AdvancedCalendarManager, CalendarEvent, MAX_BATCH_SIZE, SLOT_BUFFER_HOURS,
+    SLOT_STEP_MINUTES,
+)
+
+TIMEZONE = "America/New_York"
+
+
+def _reference_confidence(slot_start, duration_minutes, start_times, end_times):
+    """The original per-slot scoring formula, kept as the oracle for the merge-pass scorer"""
+    confidence = 1.0
+    hour = slot_start.hour
+    if 10 <= hour <= 11:
+        confidence += 0.2
+    elif 14 <= hour <= 15:
+        confidence += 0.1
+    elif hour < 9 or hour > 17:
+        confidence -= 0.3
+    if 12 <= hour <= 13:
+        confidence -= 0.1
+
+    buffer = timedelta(hours=SLOT_BUFFER_HOURS)
+    slot_end = slot_start + timedelta(minutes=duration_minutes)
+    ending_just_before = (bisect.bisect_left(end_times, slot_start)
+                          - bisect.bisect_right(end_times, slot_start - buffer))
+    starting_just_after = (bisect.bisect_left(start_times, slot_end + buffer)
+                           - bisect.bisect_right(start_times, slot_end))
+    confidence -= 0.2 * (ending_just_before + starting_just_after)
+    return max(0.1, confidence)
+
+
+def _reference_slots(tz, target_date, duration_minutes, work_start, work_end, events, max_slots):
+    """Straightforward datetime implementation of the slot search, without the epoch-float shortcuts"""
+    start_hour, end_hour = int(work_start), int(work_end)
+    current = datetime.combine(target_date, time(start_hour, int((work_start - start_hour) * 60)), tzinfo=tz)
+    end_of_day = datetime.combine(target_date, time(end_hour, int((work_end - end_hour) * 60)), tzinfo=tz)
+
+    events = sorted(events, key=lambda e: e.start_time)
+    start_times = [e.start_time for e in events]
+    end_times = sorted(e.end_time for e in events)
+
+    busy = []
+    for event in events:
+        busy_start, busy_end = max(event.start_time, current), min(event.end_time, end_of_day)
+        if busy_end <= busy_start:
+            continue
+        if busy and busy_start <= busy[-1][1]:
+            busy[-1][1] = max(busy[-1][1], busy_end)
+        else:
+            busy.append([busy_start, busy_end])
+
+    free = []
+    for busy_start, busy_end in busy:
+        if busy_start > current:
+            free.append((current, busy_start))
+        current = max(current, busy_end)
+    if current < end_of_day:
+        free.append((current, end_of_day))
+
+    step = SLOT_STEP_MINUTES * 60
+    duration = timedelta(minutes=duration_minutes)
+    slots = []
+    for free_start, free_end in free:
+        first = math.ceil(free_start.timestamp())
+        last = math.floor((free_end - duration).timestamp())
+        if last < first:
+            continue
+        # Best start in each hour of the gap, earliest on ties
+        by_hour = {}
+        for ts in [first, *range(first - first % step + step, last + 1, step)]:
+            slot_start = datetime.fromtimestamp(ts, tz)
+            confidence = _reference_confidence(slot_start, duration_minutes, start_times, end_times)
+            if slot_start.hour not in by_hour or confidence > by_hour[slot_start.hour][2]:
+                by_hour[slot_start.hour] = (slot_start, slot_start + duration, confidence)
+        slots.extend(by_hour.values())
+
+    slots.sort(key=lambda s: s[2], reverse=True)
+    return [(start, end, round(confidence, 9)) for start, end, confidence in slots[:max_slots]]
+
+
+def _random_events(rng, tz, day):
+    events = []
+    for i in range(rng.randint(0, 12)):
+        start = datetime.combine(day, time(7), tzinfo=tz) + timedelta(minutes=5 * rng.randint(0, 170))
+        end = start + timedelta(minutes=5 * rng.randint(1, 36))
+        events.append(CalendarEvent(id=str(i), title=f"Event {i}", start_time=start, end_time=end))
+    return events
+
+
+def test_find_optimal_slots_matches_reference():
+    rng = random.Random(1)
+    manager = AdvancedCalendarManager(service=None, timezone=TIMEZONE)
+    tz = manager.timezone
+    first_day = date(2024, 1, 1)
+    for offset in range(3000):
+        day = first_day + timedelta(days=offset)
+        events = _random_events(rng, tz, day)
+        time_range = rng.choice([None, (9, 17), (8.5, 12), (12, 17), (17, 21)])
+        duration = rng.choice([15, 30, 45, 60, 90])
+        max_slots = rng.choice([1, 3, 5])
+
+        work_start, work_end = time_range or (9, 17)
+        expected = _reference_slots(tz, day, duration, work_start, work_end, events, max_slots)
+        actual = manager.find_optimal_slots(day, duration, time_range, max_slots=max_slots, events=list(events))
+
+        assert [(s.start_time, s.end_time, round(s.confidence, 9)) for s in actual] == expected, (day, time_range, duration)
+
+
+# Minimal stand-in for the googleapiclient Calendar service used by the cache tests
+class _FakeRequest:
+    def __init__(self, service, params):
+        self.service, self.params = service, params
+
+    def execute(self, http=None):
+        self.service.list_calls += 1
+        time_min = datetime.fromisoformat(self.params["timeMin"].replace("Z", "+00:00"))
+        time_max = datetime.fromisoformat(self.params["timeMax"].replace("Z", "+00:00"))
+        items = [item for item in self.service.items
+                 if datetime.fromisoformat(item["end"]["dateTime"]) > time_min
+                 and datetime.fromisoformat(item["start"]["dateTime"]) < time_max]
+        return {"items": items[:self.params.get("maxResults", len(items))]}
+
+
+class _FakeInsert:
+    def __init__(self, service, body):
+        self.service, self.body = service, body
+
+    def execute(self, http=None):
+        self.service.items.append({"id": f"new{len(self.service.items)}", **self.body})
+        return {"htmlLink": "https://calendar.example/event"}
+
+
+class _FakeEvents:
+    def __init__(self, service):
+        self.service = service
+
+    def list(self, **params):
+        return _FakeRequest(self.service, params)
+
+    def insert(self, calendarId, body, **params):
+        return _FakeInsert(self.service, body)
+
+
+class _FakeBatch:
+    def __init__(self, service, callback):
+        self.service, self.callback = service, callback
+        self.requests = []
+
+    def add(self, request, request_id=None):
+        self.requests.append((request_id, request))
+
+    def execute(self, http=None):
+        self.service.batch_sizes.append(len(self.requests))
+        for request_id, request in self.requests:
+            if request_id in self.service.failing:
+                self.callback(request_id, None, RuntimeError("backend error"))
+            else:
+                self.callback(request_id, request.execute(), None)
+
+
+class _FakeService:
+    def __init__(self, items, failing=()):
+        self.items = items
+        self.list_calls = 0
+        # One entry per executed batch: how many sub-requests it carried
+        self.batch_sizes = []
+        self.failing = set(failing)
+
+    def events(self):
+        return _FakeEvents(self)
+
+    def new_batch_http_request(self, callback=None):
+        return _FakeBatch(self, callback)
+
+
+def _item(i, start, end):
+    return {"id": str(i), "summary": f"Event {i}",
+            "start": {"dateTime": start.isoformat()}, "end": {"dateTime": end.isoformat()}}
+
+
+@pytest.fixture
+def busy_day():
+    tz = ZoneInfo(TIMEZONE)
+    day = date(2026, 10, 15)
+    at = lambda hour: datetime.combine(day, time(hour), tzinfo=tz)
+    return day, [_item(1, at(9), at(10)), _item(2, at(13), at(14))]
+
+
+def test_event_cache_serves_covered_windows(busy_day):
+    day, items = busy_day
+    service = _FakeService(items)
+    manager = AdvancedCalendarManager(service, TIMEZONE)
+
+    full_day = manager.get_events_for_date_range(day, day)
+    assert service.list_calls == 1
+    assert [e.id for e in full_day] == ["1", "2"]
+
+    # A narrower window inside the cached day is answered locally and filtered
+    afternoon = manager.get_events_for_date_range(day, day, time_min_hour=12, time_max_hour=17)
+    assert service.list_calls == 1
+    assert [e.id for e in afternoon] == ["2"]
+
+
+def test_event_cache_skips_truncated_responses(busy_day):
+    day, items = busy_day
+    service = _FakeService(items)
+    manager = AdvancedCalendarManager(service, TIMEZONE)
+
+    manager.get_events_for_date_range(day, day, max_results=2)
+    manager.get_events_for_date_range(day, day, max_results=2)
+    assert service.list_calls == 2
+
+
+def test_schedule_meeting_invalidates_overlapping_windows(busy_day):
+    day, items = busy_day
+    service = _FakeService(items)
+    manager = AdvancedCalendarManager(service, TIMEZONE)
+
+    slot = manager.find_optimal_slots(day, 30)[0]
+    assert service.list_calls == 1
+    assert manager.schedule_meeting(slot, "Sync", [])
+
+    # The booked slot must no longer be offered
+    slots = manager.find_optimal_slots(day, 30)
+    assert service.list_calls == 2
+    assert slot.start_time not in [s.start_time for s in slots]
+
+
+def _local(day, hour, minute=0):
+    return datetime.combine(day, time(hour, minute), tzinfo=ZoneInfo(TIMEZONE))
+
+
+def test_free_day_offers_spread_out_slots():
+    manager = AdvancedCalendarManager(service=None, timezone=TIMEZONE)
+    day = date(2026, 10, 15)
+
+    slots = manager.find_optimal_slots(day, 30, events=[])
+    assert [s.start_time for s in slots] == [_local(day, h) for h in (10, 11, 14, 15, 9)]
+
+
+def test_gap_offers_one_slot_per_hour(busy_day):
+    day, items = busy_day
+    manager = AdvancedCalendarManager(service=None, timezone=TIMEZONE)
+    events = manager._parse_events({"items": items})
+
+    # Only the 10:00-13:00 gap is open in the morning slice; one start per hour of it
+    slots = manager.find_optimal_slots(day, 30, preferred_time_range=(9, 13), events=events)
+    assert sorted(s.start_time for s in slots) == [_local(day, 10), _local(day, 11), _local(day, 12)]
+
+
+def test_alternatives_span_several_days():
+    manager = AdvancedCalendarManager(service=None, timezone=TIMEZONE)
+    original = date(2026, 10, 15)
+    candidate_dates = manager._alternative_dates(original)
+
+    alternatives = manager._alternatives_from_events(candidate_dates, 30, {d: [] for d in candidate_dates})
+    days = [s.start_time.date() for s in alternatives]
+    assert len(alternatives) == 5
+    assert max(days.count(d) for d in days) == ALTERNATIVE_SLOTS_PER_DAY
+    assert days[:3] == [date(2026, 10, 16), date(2026, 10, 16), date(2026, 10, 19)]
+
+
+def test_batch_fetch_sends_one_batch_for_uncached_days(busy_day):
+    day, items = busy_day
+    service = _FakeService(items)
+    manager = AdvancedCalendarManager(service, TIMEZONE)
+    days = [day - timedelta(days=1), day, day + timedelta(days=1)]
+
+    events_by_date = manager._batch_fetch_days(days)
+    assert service.batch_sizes == [3]
+    assert {d: [e.id for e in events] for d, events in events_by_date.items()} == {
+        days[0]: [], day: ["1", "2"], days[2]: []}
+
+
+def test_batch_fetch_skips_cached_days(busy_day):
+    day, items = busy_day
+    service = _FakeService(items)
+    manager = AdvancedCalendarManager(service, TIMEZONE)
+    manager.get_events_for_date_range(day, day)
+    assert service.list_calls == 1
+
+    events_by_date = manager._batch_fetch_days([day, day + timedelta(days=1)], 9, 17)
+    assert service.batch_sizes == [1]
+    assert service.list_calls == 2
+    assert [e.id for e in events_by_date[day]] == ["1", "2"]
+
+
+def test_batch_fetch_error_leaves_day_empty_and_uncached(busy_day):
+    day, items = busy_day
+    service = _FakeService(items, failing={str(day)})
+    manager = AdvancedCalendarManager(service, TIMEZONE)
+    next_day = day + timedelta(days=1)
+    service.items.append(_item(3, _local(next_day, 9), _local(next_day, 10)))
+
+    events_by_date = manager._batch_fetch_days([day, next_day])
+    assert events_by_date[day] == []
+    assert [e.id for e in events_by_date[next_day]] == ["3"]
+
+    # The failed day was not cached, so it is requested again
+    service.failing.clear()
+    assert [e.id for e in manager.get_events_for_date_range(day, day)] == ["1", "2"]
+
+
+def test_batch_fetch_chunks_at_max_batch_size():
+    service = _FakeService([])
+    manager = AdvancedCalendarManager(service, TIMEZONE)
+    days = [date(2026, 1, 1) + timedelta(days=i) for i in range(2 * MAX_BATCH_SIZE + 20)]
+
+    events_by_date = manager._batch_fetch_days(days)
+    assert service.batch_sizes == [MAX_BATCH_SIZE, MAX_BATCH_SIZE, 20]
+    assert list(events_by_date) == days
+
+
+def test_suggest_alternative_times_fetches_candidate_days_in_one_batch(busy_day):
+    day, items = busy_day
+    service = _FakeService(items)
+    manager = AdvancedCalendarManager(service, TIMEZONE)
+
+    alternatives = manager.suggest_alternative_times(day - timedelta(days=1), 60)
+    assert service.batch_sizes == [len(manager._alternative_dates(day - timedelta(days=1)))]
+    # The busy day still offers its best free hours, never one overlapping an event
+    assert [s.start_time for s in alternatives[:ALTERNATIVE_SLOTS_PER_DAY]] == [_local(day, 10), _local(day, 11)]
+
+
+def test_prefetch_warms_the_cache(busy_day):
+    day, items = busy_day
+    service = _FakeService(items)
+    manager = AdvancedCalendarManager(service, TIMEZONE)
+
+    asyncio.run(manager.prefetch_days_async([day, day + timedelta(days=1)]))
+    assert service.batch_sizes == [2]
+
+    # The slot search that follows is answered from the prefetched days
+    manager.find_optimal_slots(day, 30)
+    assert service.list_calls == 2
+    # The in-flight guard is released, so a later turn can prefetch again
+    asyncio.run(manager.prefetch_days_async([day + timedelta(days=2)]))
+    assert service.batch_sizes == [2, 1]
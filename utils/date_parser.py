@@ -1,15 +1,105 @@
 import re
-from datetime import datetime, date, timedelta
+from datetime import datetime, date, time, timedelta
 from dateutil import parser as date_parser
+from functools import lru_cache
 from typing import Optional, Tuple
 
+_MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+
+_WEEKDAYS = {
+    "monday": 0, "tuesday": 1, "wednesday": 2, "thursday": 3,
+    "friday": 4, "saturday": 5, "sunday": 6,
+}
+
+# "<month> <day>[, <year>]", e.g. "nov 5", "November 5th, 2025"
+_ABSOLUTE_DATE_RE = re.compile(
+    r"\b(?P<m>january|february|march|april|may|june|july|august|september|october|november|december"
+    r"|jan|feb|mar|apr|jun|jul|aug|sept|sep|oct|nov|dec)\.?\s+(?P<d>\d{1,2})(?:st|nd|rd|th)?"
+    r"(?:,?\s+(?P<y>\d{4}))?\b",
+    re.IGNORECASE,
+)
+# "<year>-<month>-<day>", e.g. "2025-11-05", anywhere in the text
+_ISO_DATE_RE = re.compile(r"\b(?P<y>\d{4})-(?P<m>\d{1,2})-(?P<d>\d{1,2})\b")
+# "<day>/<month>[/<year>]", e.g. "5/11", "05/11/2025"
+_NUMERIC_DATE_RE = re.compile(r"\b(?P<d>\d{1,2})/(?P<m>\d{1,2})(?:/(?P<y>\d{4}|\d{2}))?\b")
+# Bare ordinal day, e.g. "friday the 23rd"; like dateutil, it falls in the current month
+_ORDINAL_DAY_RE = re.compile(r"\b(?P<d>\d{1,2})(?:st|nd|rd|th)\b")
+
+
+def parse_absolute_date(text: str, today: date) -> Optional[date]:
+    """Match the common spoken/typed absolute date shapes without invoking dateutil"""
+    match = _ISO_DATE_RE.search(text)
+    if match:
+        month = int(match.group("m"))
+    else:
+        match = _ABSOLUTE_DATE_RE.search(text)
+        if match:
+            month = _MONTHS[match.group("m")[:3].lower()]
+        else:
+            match = _NUMERIC_DATE_RE.search(text)
+            if match:
+                month = int(match.group("m"))
+            else:
+                match = _ORDINAL_DAY_RE.search(text)
+                if not match:
+                    return None
+                month = today.month
+
+    year = match.groupdict().get("y")
+    if year is None:
+        year = today.year
+    elif len(year) == 2:
+        year = 2000 + int(year)
+    try:
+        return date(int(year), month, int(match.group("d")))
+    except ValueError:
+        return None
+
+
+def this_weekday_offset(target_weekday: int, current_weekday: int) -> int:
+    """Days until the coming target weekday (Monday=0), rolling today over to next week"""
+    days_ahead = target_weekday - current_weekday
+    if days_ahead <= 0:  # If it's today or past, go to next week
+        days_ahead += 7
+    return days_ahead
+
+
+def upcoming_weekday_offset(target_weekday: int, current_weekday: int) -> int:
+    """Days until a bare weekday (Monday=0): today if it matches, otherwise later this week"""
+    return (target_weekday - current_weekday) % 7
+
+
+def next_weekday_offset(target_weekday: int, current_weekday: int) -> int:
+    """Days until the target weekday (Monday=0) in the following week"""
+    return target_weekday - current_weekday + 7  # Always next week
+
+
+@lru_cache(maxsize=256)
+def fuzzy_parse_date(text: str, today: date) -> Optional[date]:
+    """dateutil fuzzy parsing as a last resort, memoized; today fills in missing fields"""
+    try:
+        return date_parser.parse(text, fuzzy=True, default=datetime.combine(today, time.min)).date()
+    except (ValueError, TypeError, OverflowError):
+        return None
+
 class AdvancedDateParser:
-    def __init__(self):
-        self.today = date.today()
+    @property
+    def today(self) -> date:
+        """Current date, read on each access so a long-running agent rolls over at midnight"""
+        return date.today()
         
     def parse_complex_date(self, text: str) -> Optional[date]:
         """Handle complex date expressions"""
         text = text.lower().strip()
+        today = self.today
+        
+        # An explicit date wins over any weekday or relative word said alongside it
+        absolute = parse_absolute_date(text, today)
+        if absolute:
+            return absolute
         
         # Relative dates
         if "next week" in text:
@@ -18,52 +108,47 @@ class AdvancedDateParser:
                 days_ahead += 3  # Go to Thursday/Friday of next week
             elif "early" in text:
                 days_ahead += 1  # Go to Tuesday of next week
-            return self.today + timedelta(days=days_ahead)
+            return today + timedelta(days=days_ahead)
         
         # Specific patterns
-        patterns = {
-            r"tomorrow": lambda: self.today + timedelta(days=1),
-            r"day after tomorrow": lambda: self.today + timedelta(days=2),
-            r"this (monday|tuesday|wednesday|thursday|friday|saturday|sunday)": self._parse_this_weekday,
-            r"next (monday|tuesday|wednesday|thursday|friday|saturday|sunday)": self._parse_next_weekday,
-            r"in (\d+) days?": lambda match: self.today + timedelta(days=int(match.group(1))),
-            r"(\d+) days? from now": lambda match: self.today + timedelta(days=int(match.group(1))),
-        }
-        
-        for pattern, handler in patterns.items():
-            match = re.search(pattern, text)
+        for pattern, handler in _PATTERNS:
+            match = pattern.search(text)
             if match:
                 try:
-                    return handler(match) if callable(handler) else handler()
-                except:
+                    return handler(self, match)
+                except (ValueError, TypeError, OverflowError):
                     continue
         
-        # Try standard date parsing
-        try:
-            parsed = date_parser.parse(text, fuzzy=True)
-            return parsed.date()
-        except:
-            pass
-        
-        return None
+        # dateutil as a last resort
+        return fuzzy_parse_date(text, today)
     
     def _parse_this_weekday(self, match):
         """Parse 'this Monday', 'this Friday', etc."""
-        weekdays = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
-        target_weekday = weekdays.index(match.group(1))
-        current_weekday = self.today.weekday()
-        
-        days_ahead = target_weekday - current_weekday
-        if days_ahead <= 0:  # If it's today or past, go to next week
-            days_ahead += 7
-            
-        return self.today + timedelta(days=days_ahead)
+        today = self.today
+        days_ahead = this_weekday_offset(_WEEKDAYS[match.group(1)], today.weekday())
+        return today + timedelta(days=days_ahead)
+    
+    def _parse_weekday(self, match):
+        """Parse a bare 'Monday', 'Friday', etc. (same rule as NLPProcessor.extract_date)"""
+        today = self.today
+        days_ahead = upcoming_weekday_offset(_WEEKDAYS[match.group(1)], today.weekday())
+        return today + timedelta(days=days_ahead)
     
     def _parse_next_weekday(self, match):
         """Parse 'next Monday', 'next Friday', etc."""
-        weekdays = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
-        target_weekday = weekdays.index(match.group(1))
-        current_weekday = self.today.weekday()
-        
-        days_ahead = target_weekday - current_weekday + 7  # Always next week
-        return self.today + timedelta(days=days_ahead)
\ No newline at end of file
+        today = self.today
+        days_ahead = next_weekday_offset(_WEEKDAYS[match.group(1)], today.weekday())
+        return today + timedelta(days=days_ahead)
+
+
+# Compiled once at import; checked in order, so "day after tomorrow" must precede "tomorrow".
+# Handlers take (parser, match).
+_PATTERNS = (
+    (re.compile(r"day after tomorrow"), lambda parser, match: parser.today + timedelta(days=2)),
+    (re.compile(r"tomorrow"), lambda parser, match: parser.today + timedelta(days=1)),
+    (re.compile(r"this (monday|tuesday|wednesday|thursday|friday|saturday|sunday)"), AdvancedDateParser._parse_this_weekday),
+    (re.compile(r"next (monday|tuesday|wednesday|thursday|friday|saturday|sunday)"), AdvancedDateParser._parse_next_weekday),
+    (re.compile(r"\b(monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b"), AdvancedDateParser._parse_weekday),
+    (re.compile(r"in (\d+) days?"), lambda parser, match: parser.today + timedelta(days=int(match.group(1)))),
+    (re.compile(r"(\d+) days? from now"), lambda parser, match: parser.today + timedelta(days=int(match.group(1)))),
+)